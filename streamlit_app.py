@@ -1,49 +1,38 @@
-import time
 import streamlit as st
 from streamlit_cookies_controller import CookieController
 import pandas as pd
+import numpy as np
 from wordcloud import WordCloud
+import matplotlib
+matplotlib.use('Agg')  # Headless rendering, set before seaborn pulls in pyplot
 import matplotlib.patches as mpatches
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import re
 import seaborn as sns
 
 ######################################################################################
 # Claude Sonnet helped build general structure of these functions to extend search capabilities
+# A bare word, a "quoted phrase", or a word running straight into a quoted phrase (col:"a b")
+_TOKEN_RE = re.compile(r'([^\s"]*)"([^"]*)"?|([^\s"]+)')
+
 def parse_search_terms(search_input):
     """Parse search input to separate column-specific searches and exact phrases"""
-    terms = []
     column_searches = {}
     
-    # Split by space but preserve quoted phrases
-    current_term = []
-    in_quotes = False
-    
-    for i in range(len(search_input)):
-        if search_input[i] == '"':
-            in_quotes = not in_quotes
-            if not in_quotes and current_term:
-                terms.append(''.join(current_term))
-                current_term = []
-        elif search_input[i] == ' ' and not in_quotes:
-            if current_term:
-                terms.append(''.join(current_term))
-                current_term = []
-        else:
-            current_term.append(search_input[i])
-    
-    if current_term:
-        terms.append(''.join(current_term))
+    # Split by whitespace but preserve quoted phrases
+    terms = [prefix + phrase or word for prefix, phrase, word in _TOKEN_RE.findall(search_input)]
+    terms = [term for term in terms if term]
 
     # Process terms for column-specific searches
     final_terms = []
     
-    for i in range(len(terms)):
+    i = 0
+    while i < len(terms):
         term = terms[i]
         if ':' in term:
-            col = term.split(':', 1)[0].strip().lower()
+            col, value = term.split(':', 1)
+            col = col.strip().lower()
             # If the value is empty after the colon, look at the next term
-            value = term.split(':', 1)[1]
             if not value.strip():
                 # Check if there are more terms to consume
                 if i + 1 < len(terms):
@@ -52,6 +41,7 @@ def parse_search_terms(search_input):
             column_searches[col] = value.strip()
         else:
             final_terms.append(term)
+        i += 1
     
     return final_terms, column_searches
 
@@ -61,24 +51,47 @@ def apply_search_filters(data, search_input, data_filters):
         return data
     
     terms, column_searches = parse_search_terms(search_input)
-    filtered_data = data.copy()
+    lc_map = {c.lower(): c for c in data.columns}
     
-    # Apply column-specific searches
+    # Apply column-specific searches, AND-ing their masks so the frame is indexed once
+    masks = []
     for col, value in column_searches.items():
-        matching_cols = [c for c in filtered_data.columns if c.lower() == col.lower()]
-        if matching_cols:
-            filtered_data = filtered_data[
-                filtered_data[matching_cols[0]].astype(str).str.contains(value, case=False)
-            ]
+        real_col = lc_map.get(col)
+        if real_col is not None:
+            masks.append(
+                data[real_col].astype(str).str.contains(value, case=False, regex=False, na=False).to_numpy()
+            )
+    if masks:
+        data = data[np.logical_and.reduce(masks)]
+        if data.empty:
+            return data  # Nothing left for the general terms to narrow down
                 
-    for term in terms:
-        if term:  # Skip empty terms
-            term_filter = filtered_data.astype(str).apply(
-                lambda x: x.str.contains(term, case=False)
-            ).any(axis=1)
-            filtered_data = filtered_data[term_filter]
-    
-    return filtered_data
+    lowered_terms = [term.lower() for term in terms if term]  # Skip empty terms
+    if lowered_terms:
+        text_cols = data.select_dtypes(include=['object', 'string', 'category']).columns
+        num_cols = data.select_dtypes(include='number').columns
+        
+        # Lowercase each text column once and join them per row with a separator no term
+        # can contain, so every term is checked against a row in a single pass
+        str_cols = [data[c].astype(str).str.lower() for c in text_cols]
+        row_text = str_cols[0].str.cat(str_cols[1:], sep='\n', na_rep='')
+        word_terms = [t for t in lowered_terms if not t.isdecimal()]
+        term_filter = np.fromiter(
+            (all(t in row for t in word_terms) for row in row_text),
+            dtype=bool,
+            count=len(row_text)
+        )
+        
+        # Whole numbers can also match numeric columns (e.g. release_year) exactly
+        for t in lowered_terms:
+            if t.isdecimal():
+                number_filter = np.fromiter((t in row for row in row_text), dtype=bool, count=len(row_text))
+                for c in num_cols:
+                    number_filter |= (data[c] == int(t)).to_numpy()
+                term_filter &= number_filter
+        data = data[term_filter]
+    
+    return data
 
 def data_page(data):
     # Header
@@ -90,11 +103,9 @@ def data_page(data):
     # Sidebar
     st.sidebar.title('Data Filters')
     columns = data.columns.tolist()
-    data_filters = []
-
-    for col in columns:
-        if st.sidebar.checkbox(col, value=True):
-            data_filters.append(col)
+    selected = st.sidebar.multiselect('Columns', options=columns, default=columns)
+    # Keep the table in dataset column order regardless of the order columns are picked
+    data_filters = [col for col in columns if col in selected]
     
     st.markdown("")
     st.markdown("")
@@ -118,62 +129,68 @@ def data_page(data):
         
 ######################################################################################
 
-def word_cloud_page(data):
-    text = ' '.join(data['title'].astype(str))
-    
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Remove common word clutter (could add bool to keep this)
+common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of'}
+_STOP_RE = re.compile(r'\b(?:' + '|'.join(common_words) + r')\b\s*')
+
+@st.cache_data(show_spinner="Generating word cloud...")
+def build_wordcloud(text):
+    """Render the word cloud once per title text and return it as an image array"""
     # Clean the text by removing special characters
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    # Remove common word clutter (could add bool to keep this)
-    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of'}
-    text = ' '.join([word for word in text.lower().split() if word not in common_words])
+    text = _PUNCT_RE.sub('', text)
+    text = _STOP_RE.sub('', text.lower())
     
-    progress_bar = st.progress(0)
-    wordcloud = WordCloud()
-    for percent in range(3):
-        wordcloud = WordCloud(width=800, height=400, mode="RGBA", background_color="rgb(14,17,23)").generate(text)
-        time.sleep(0.4)
-        progress_bar.progress((percent+1)*33+1)
-    
-    progress_bar.empty()
+    wordcloud = WordCloud(width=800, height=400, mode="RGBA", background_color="rgb(14,17,23)").generate(text)
+    return wordcloud.to_array()
+
+def word_cloud_page(data):
+    wordcloud = build_wordcloud(data['title'].astype(str).str.cat(sep=' '))
     
-    fig = plt.figure()
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    plt.subplots_adjust(left=0, right=5, top=5, bottom=0)
+    fig = Figure()
+    ax = fig.subplots()
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis('off')
+    fig.subplots_adjust(left=0, right=5, top=5, bottom=0)
     fig.patch.set_facecolor((0.055,0.066,0.09,1))
     st.pyplot(fig)
     st.caption("Most common words in titles for Netflix movies and TV shows.")
     
 ######################################################################################
     
+# MPAA and TV parental guideline ratings (TV-Y7-FV included)
+_RATING_PATTERN = r'G|PG|PG-13|R|NC-17|NR|UR|TV-[A-Z0-9-]+'
+
+def count_ratings(data):
+    """Count titles per rating, ascending, for the rating bar chart"""
+    # Keep only real ratings, dropping stray values like durations ('74 min') in the column
+    valid_data = data[data['rating'].astype('string').str.fullmatch(_RATING_PATTERN, na=False)]
+    rating_counts = valid_data['rating'].cat.remove_unused_categories().value_counts()
+    # Plain string labels so seaborn draws the bars in count order, not category order
+    rating_counts.index = rating_counts.index.astype(str)
+    return rating_counts.sort_values()
+
 def rating_dist_bars(data):
-    progress_bar = st.progress(0)
-    for percent in range(3):
-        time.sleep(0.25)
-        progress_bar.progress((percent+1)*33+1)
-    
-    progress_bar.empty()
-    
-    # Remove random non-rating values from the data
-    valid_data = data[~data['rating'].isin(['66 min', '74 min', '84 min'])]
-    rating_counts = valid_data['rating'].value_counts().sort_values()
+    rating_counts = count_ratings(data)
     
-    fig, ax = plt.subplots(figsize=(9, 4))
+    fig = Figure(figsize=(9, 4))
+    ax = fig.subplots()
     
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     ax.spines['bottom'].set_visible(False)
     
-    colors = ['goldenrod' if 'tv' in rating.lower() else 'cornflowerblue' for rating in rating_counts.index]
-    sns.barplot(x=rating_counts.values, y=rating_counts.index, palette=colors)
+    is_tv = rating_counts.index.str.lower().str.contains('tv', regex=False)
+    colors = np.where(is_tv, 'goldenrod', 'cornflowerblue').tolist()
+    sns.barplot(x=rating_counts.values, y=rating_counts.index, palette=colors, ax=ax)
     
-    plt.title('Distribution of Content Ratings', fontsize=20, color='white')
-    plt.xticks(color='white')
-    plt.yticks(fontsize=12, color='white')
-    plt.ylabel('')
-    plt.tight_layout()
-    plt.annotate(
+    ax.set_title('Distribution of Content Ratings', fontsize=20, color='white')
+    ax.tick_params(axis='x', labelcolor='white')
+    ax.tick_params(axis='y', labelsize=12, labelcolor='white')
+    ax.set_ylabel('')
+    fig.tight_layout()
+    ax.annotate(
         "Adult rated content dominates",
         xy=(60, 10),
         xytext=(800, 9),
@@ -183,19 +200,24 @@ def rating_dist_bars(data):
     
     movie_patch = mpatches.Patch(color='cornflowerblue', label='Movie Ratings')
     tv_patch = mpatches.Patch(color='goldenrod', label='TV Ratings')
-    plt.legend(handles=[movie_patch, tv_patch], loc='upper right', facecolor=(0.055, 0.066, 0.09, 1), edgecolor='white', labelcolor='white')
+    ax.legend(handles=[movie_patch, tv_patch], loc='upper right', facecolor=(0.055, 0.066, 0.09, 1), edgecolor='white', labelcolor='white')
     
     fig.patch.set_facecolor((0.055, 0.066, 0.09, 1))
     ax.set_facecolor((0.055, 0.066, 0.09, 1))
     st.pyplot(fig)
 
-def content_type_trends(data):
+def count_yearly_content(data):
+    """Count titles per release year and type, leaving out the incomplete latest year"""
     max_year = data['release_year'].max()
     data_filtered = data[data['release_year'] < max_year]
     
-    yearly_content = data_filtered.groupby(['release_year', 'type']).size().unstack(fill_value=0)
+    return data_filtered.groupby(['release_year', 'type'], observed=True).size().unstack(fill_value=0)
+
+def content_type_trends(data):
+    yearly_content = count_yearly_content(data)
     
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
     for content_type in yearly_content.columns:
         ax.plot(yearly_content.index, yearly_content[content_type], label=content_type)
     
@@ -210,10 +232,10 @@ def content_type_trends(data):
     ax.set_ylabel('Number of Titles Added', fontsize=14, color='white')
     ax.legend(facecolor=(0.055, 0.066, 0.09, 1), edgecolor='white', labelcolor='white')
     
-    plt.xticks(color='white')
-    plt.yticks(color='white')
-    plt.tight_layout()
-    plt.annotate(
+    ax.tick_params(axis='x', labelcolor='white')
+    ax.tick_params(axis='y', labelcolor='white')
+    fig.tight_layout()
+    ax.annotate(
         "Movies seem to be getting less popular to \n make and/or to acquire for Netflix",
         xy=(1950, 250),
         xytext=(1950, 250),
@@ -245,18 +267,24 @@ def conclusion(data):
                 Ultimately, Netflix certainly knows what they are doing and analyzes their data much closer than this. So we can surely follow their trends and expect that we will do well.
                 """)
     
+@st.cache_data
+def load_data(path):
+    """Read the dataset once per process instead of on every rerun"""
+    # Low-cardinality text columns as categories, so grouping and counting run on integer codes
+    return pd.read_csv(path, dtype={'rating': 'category', 'type': 'category', 'country': 'category'})
+
 ######################################################################################
 #    MAIN (the lazy way)
 ######################################################################################
 
-data = pd.read_csv("netflix_titles.csv")
-
 st.set_page_config(
     page_title="Netflix Data",
     page_icon="🎬",
     layout="wide"
 )
 
+data = load_data("netflix_titles.csv")
+
 cookie_pages = [
     "Raw Data", 
     "Word Cloud", 